@@ -16,6 +16,9 @@
 #include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 
+#include <algorithm>
+#include <utility>
+
 #include "dali/pipeline/init.h"
 #include "dali/pipeline/operators/operator.h"
 #include "dali/pipeline/operators/op_schema.h"
@@ -436,6 +439,135 @@ static const OpSchema &GetSchema(const string &name) {
   return SchemaRegistry::GetSchema(name);
 }
 
+// Adds a single argument to the spec. Plain Python scalars are converted
+// directly, anything else (lists, enums, TFRecord features, ints outside
+// of the int64 range) is dispatched through the overloaded AddArg binding
+// of `py_spec`, so it behaves exactly as a separate AddArg call would.
+static void AddArgFromPython(const py::object &py_spec, OpSpec *spec,
+                             const string &name, py::handle value) {
+  PyObject *ptr = value.ptr();
+  if (PyStr_Check(ptr)) {
+    spec->AddArg(name, value.cast<std::string>());
+    return;
+  }
+  if (PyBool_Check(ptr)) {
+    spec->AddArg(name, value.cast<bool>());
+    return;
+  }
+  if (PyInt_Check(ptr) || PyLong_Check(ptr)) {
+    int overflow = 0;
+    int64 v = PyLong_AsLongLongAndOverflow(ptr, &overflow);
+    if (overflow == 0 && !(v == -1 && PyErr_Occurred())) {
+      spec->AddArg(name, v);
+      return;
+    }
+    PyErr_Clear();
+  } else if (PyFloat_Check(ptr)) {
+    spec->AddArg(name, value.cast<float>());
+    return;
+  }
+  py_spec.attr("AddArg")(name, value);
+}
+
+// Name of the type of `obj`, as reported by type(obj).__name__ in Python
+static string PyTypeName(py::handle obj) {
+  py::handle type(reinterpret_cast<PyObject *>(Py_TYPE(obj.ptr())));
+  return type.attr("__name__").cast<string>();
+}
+
+static py::object TensorReferenceType() {
+  // Imported on first use only. The reference is kept for the lifetime of the process.
+  // A plain pointer (instead of a guarded static object) avoids holding a C++
+  // initialization lock while the import may release the GIL.
+  static PyObject *tensor_ref_type = nullptr;
+  if (tensor_ref_type == nullptr) {
+    py::object type = py::module::import("nvidia.dali.tensor").attr("TensorReference");
+    tensor_ref_type = type.release().ptr();
+  }
+  return py::reinterpret_borrow<py::object>(tensor_ref_type);
+}
+
+static void EnforceTensorReference(py::handle obj, py::handle tensor_ref_type) {
+  if (!py::isinstance(obj, tensor_ref_type)) {
+    throw py::type_error("Expected inputs of type TensorReference. "
+        "Received input type " + PyTypeName(obj) + ".");
+  }
+}
+
+// Adds the regular inputs of an operator instance to its spec in a single pass.
+// `inputs` holds either TensorReferences or equally long lists of TensorReferences.
+// Lists are interleaved (i-th element of every list, then (i+1)-th) and their
+// length is stored in the `num_input_sets` argument.
+static void BuildInputSpec(OpSpec *spec, py::sequence inputs) {
+  if (inputs.size() == 0) {
+    return;
+  }
+  py::object tensor_ref_type = TensorReferenceType();
+  auto add_input = [spec, &tensor_ref_type](py::handle inp) {
+    EnforceTensorReference(inp, tensor_ref_type);
+    spec->AddInput(inp.attr("name").cast<string>(), inp.attr("device").cast<string>());
+  };
+
+  py::object first = inputs[0];
+  if (py::isinstance(first, tensor_ref_type)) {
+    for (auto inp : inputs) {
+      add_input(inp);
+    }
+  } else if (py::isinstance<py::list>(first)) {
+    const size_t length = py::len(first);
+    for (auto inp : inputs) {
+      if (!py::isinstance<py::list>(inp)) {
+        throw py::type_error("Expected inputs of type list of TensorReference. "
+            "Received input type " + PyTypeName(inp) + ".");
+      }
+      if (py::len(inp) != length) {
+        throw std::runtime_error("Expected input lists to have the same length (" +
+            std::to_string(length) + "). Received list of length " +
+            std::to_string(py::len(inp)) + ".");
+      }
+    }
+    for (size_t i = 0; i < length; ++i) {
+      for (auto inp : inputs) {
+        py::object item = py::reinterpret_borrow<py::list>(inp)[i];
+        add_input(item);
+      }
+    }
+    spec->AddArg("num_input_sets", static_cast<int64>(length));
+  } else {
+    throw py::type_error("Expected inputs of type TensorReference or list of TensorReference. "
+        "Received input type " + PyTypeName(first));
+  }
+}
+
+// Adds the tensor arguments of an operator instance to its spec, ordered by
+// argument name, and returns their TensorReferences in the same order.
+// The `name` keyword is the name of the instance, not an argument input.
+static py::list BuildArgumentInputSpec(OpSpec *spec, py::dict kwargs) {
+  py::list refs;
+  if (kwargs.size() == 0) {
+    return refs;
+  }
+  std::vector<std::pair<string, py::object>> args;
+  for (auto item : kwargs) {
+    string arg_name = item.first.cast<string>();
+    if (arg_name != "name") {
+      args.emplace_back(arg_name, py::reinterpret_borrow<py::object>(item.second));
+    }
+  }
+  std::sort(args.begin(), args.end(),
+      [](const std::pair<string, py::object> &a, const std::pair<string, py::object> &b) {
+        return a.first < b.first;
+      });
+
+  py::object tensor_ref_type = TensorReferenceType();
+  for (auto &arg : args) {
+    EnforceTensorReference(arg.second, tensor_ref_type);
+    spec->AddArgumentInput(arg.first, arg.second.attr("name").cast<string>());
+    refs.append(arg.second);
+  }
+  return refs;
+}
+
 static constexpr int GetCxx11AbiFlag() {
 #ifdef _GLIBCXX_USE_CXX11_ABI
   return _GLIBCXX_USE_CXX11_ABI;
@@ -710,6 +842,15 @@ PYBIND11_MODULE(backend_impl, m) {
         py::return_value_policy::reference_internal)
     .def("AddOutput", &OpSpec::AddOutput,
         py::return_value_policy::reference_internal)
+    .def("AddOutputsFromRefs",
+        [](OpSpec *spec, py::sequence refs) -> OpSpec& {
+          for (auto ref : refs) {
+            spec->AddOutput(ref.attr("name").cast<string>(),
+                ref.attr("device").cast<string>());
+          }
+          return *spec;
+        }, "refs"_a,
+        py::return_value_policy::reference_internal)
     DALI_OPSPEC_ADDARG(std::string)
     DALI_OPSPEC_ADDARG(bool)
     DALI_OPSPEC_ADDARG(int64)
@@ -722,6 +863,14 @@ PYBIND11_MODULE(backend_impl, m) {
           DALI_FAIL("Unsupported argument type with name " + name);
           return *spec;
         }, py::return_value_policy::reference_internal)
+    .def("AddArgs",
+        [](py::object self, py::dict args) -> py::object {
+          OpSpec *spec = self.cast<OpSpec *>();
+          for (auto item : args) {
+            AddArgFromPython(self, spec, item.first.cast<string>(), item.second);
+          }
+          return self;
+        }, "args"_a)
     .def("__repr__", &OpSpec::ToString)
     .def("copy", [](OpSpec &o) -> OpSpec * {
         OpSpec * ret = new OpSpec(o);
@@ -737,6 +886,9 @@ PYBIND11_MODULE(backend_impl, m) {
   // Registry for OpSchema
   m.def("GetSchema", &GetSchema, py::return_value_policy::reference);
 
+  m.def("BuildInputSpec", &BuildInputSpec, "spec"_a, "inputs"_a);
+  m.def("BuildArgumentInputSpec", &BuildArgumentInputSpec, "spec"_a, "kwargs"_a);
+
   py::class_<OpSchema>(m, "OpSchema")
     .def("Dox", &OpSchema::Dox)
     .def("MaxNumInput", &OpSchema::MaxNumInput)
@@ -15,14 +15,15 @@
 #pylint: disable=no-member
 import sys
 import copy
-from itertools import count
+import weakref
 from nvidia.dali import backend as b
 from nvidia.dali.tensor import TensorReference
 from nvidia.dali.types import _type_name_convert_to_string, _type_convert_value, DALIDataType
-from future.utils import with_metaclass
 
 _blacklisted_ops = set(["MakeContiguous"])
 
+_ERR_NUM_INPUTS = "Operator {} expects [{}, {}] inputs, but received {}"
+
 def _docstring_generator(cls):
     __cpu_ops = set(b.RegisteredCPUOps())
     __cpu_ops.add("TFRecordReader")
@@ -72,101 +73,52 @@ Parameters
         ret += '\n'
     return ret
 
-class _OpCounter(object):
-    #pylint: disable=too-few-public-methods
-    _op_count = count(0)
-    def __init__(self):
-        self._id = next(self._op_count)
-
-    @property
-    def id(self):
-        return self._id
+# Ids are handed out while the pipeline graph is built,
+# which happens in a single thread
+_NEXT_OP_ID = 0
 
 class _OperatorInstance(object):
+    __slots__ = ('_id', '_inputs', '_outputs', '_op', '_spec', '_name', '__weakref__')
+
     def __init__(self, inputs, op, **kwargs):
-        self._counter = _OpCounter()
-        self._inputs = inputs
+        global _NEXT_OP_ID
+        self._id = _NEXT_OP_ID
+        _NEXT_OP_ID += 1
         self._outputs = []
         self._op = op
         self._spec = op.spec.copy()
-        if "name" in kwargs.keys():
+        if "name" in kwargs:
             self._name = kwargs["name"]
         else:
-            self._name = '__' + type(op).__name__ + "_" + str(self._counter.id)
+            self._name = '__' + type(op).__name__ + "_" + str(self._id)
         # Add inputs
         if inputs:
-            if isinstance(inputs[0], TensorReference):
-                for inp in inputs:
-                    if not isinstance(inp, TensorReference):
-                        raise TypeError(
-                            ("Expected inputs of type " +
-                            "TensorReference. Received " +
-                            "input type {}.")
-                            .format(type(inp).__name__))
-                    self._spec.AddInput(inp.name, inp.device)
-            elif isinstance(inputs[0], list):
-                length = len(inputs[0])
-                for i in range(length):
-                    for inp in inputs:
-                        if not isinstance(inp, list):
-                            raise TypeError(
-                                ("Expected inputs of type list of " +
-                                "TensorReference. Received " +
-                                "input type {}.")
-                                .format(type(inp).__name__))
-                        if len(inp) != length:
-                            raise RuntimeError(
-                                    ("Expected input lists " +
-                                    "to have the same length " +
-                                    "({}). Received list of " +
-                                    "length {}.")
-                                    .format(length, len(inp)))
-                        if not isinstance(inp[i], TensorReference):
-                            raise TypeError(
-                                ("Expected inputs of type " +
-                                "TensorReference. Received " +
-                                "input type {}.")
-                                .format(type(inp[i]).__name__))
-                        self._spec.AddInput(inp[i].name, inp[i].device)
-                self._spec.AddArg("num_input_sets", length)
-            else:
-                raise TypeError(
-                    ("Expected inputs of type TensorReference or list of " +
-                    "TensorReference. Received input type {}")
-                    .format(type(inputs[0]).__name__))
+            b.BuildInputSpec(self._spec, inputs)
         # Argument inputs
-        for k in sorted(kwargs.keys()):
-            if k not in ["name"]:
-                if not isinstance(kwargs[k], TensorReference):
-                    raise TypeError(
-                            ("Expected inputs of type " +
-                            "TensorReference. Received " +
-                            "input type {}")
-                            .format(type(kwargs[k]).__name__))
-                self._spec.AddArgumentInput(k, kwargs[k].name)
-                self._inputs = list(self._inputs) + [kwargs[k]]
+        self._inputs = list(inputs)
+        if kwargs:
+            self._inputs.extend(b.BuildArgumentInputSpec(self._spec, kwargs))
 
     def check_args(self):
         self._op.schema.CheckArgs(self._spec)
 
     def generate_outputs(self):
         # Add outputs
-        if self._op.device == "gpu" or self._op.device == "mixed":
-            output_device = "gpu"
-        else:
-            output_device = "cpu"
+        output_device = self._op._output_device
 
-        num_output = self._op.schema.CalculateOutputs(self._spec) + self._op.schema.CalculateAdditionalOutputs(self._spec)
+        spec = self._spec
+        schema = self._op.schema
+        num_output = schema.CalculateOutputs(spec) + schema.CalculateAdditionalOutputs(spec)
 
-        for i in range(num_output):
-            t_name = type(self._op).__name__ + "_id_" + str(self.id) + "_output_" + str(i)
-            t = TensorReference(t_name, output_device, self)
-            self._spec.AddOutput(t.name, t.device)
-            self.append_output(t)
+        prefix = "{}_id_{}_output_".format(type(self._op).__name__, self._id)
+        outputs = [TensorReference(prefix + str(i), output_device, self)
+                   for i in range(num_output)]
+        self.add_outputs(outputs)
+        return outputs
 
     @property
     def id(self):
-        return self._counter.id
+        return self._id
 
     @property
     def inputs(self):
@@ -174,7 +126,11 @@ class _OperatorInstance(object):
 
     @property
     def outputs(self):
-        return self._outputs
+        """Outputs of this instance, in order.
+
+        Outputs are held weakly (see `add_outputs`), so the ones no longer
+        referenced elsewhere are `None`."""
+        return [ref() for ref in self._outputs]
 
     @property
     def spec(self):
@@ -184,19 +140,38 @@ class _OperatorInstance(object):
     def name(self):
         return self._name
 
-    def append_output(self, output):
-        self._outputs.append(output)
+    def add_outputs(self, outputs):
+        # Every output references this instance as its source, so only weak
+        # references are kept here to avoid a reference cycle per operator
+        self._outputs.extend([weakref.ref(t) for t in outputs])
+        self._spec.AddOutputsFromRefs(outputs)
 
 class _DaliOperatorMeta(type):
     @property
     def __doc__(self):
+        # The common base class is not an operator and has no schema
+        if self is _DaliOperatorBase:
+            return None
         return _docstring_generator(self)
 
+# Common base of all operator classes. Calling the metaclass directly creates it once
+# and works on both Python 2 and 3, unlike the `metaclass` keyword in a class statement.
+# Operators keep supporting weak references despite using __slots__
+_DaliOperatorBase = _DaliOperatorMeta("_DaliOperatorBase", (object,),
+                                      {"__slots__": ("__weakref__",)})
+
 def python_op_factory(name, op_device = "cpu"):
-    class Operator(with_metaclass(_DaliOperatorMeta, object)):
+    # Schemas are immutable, so look them up once per class instead of per instance/call
+    _schema = b.GetSchema(name)
+    _min_in = _schema.MinNumInput()
+    _max_in = _schema.MaxNumInput()
+
+    class Operator(_DaliOperatorBase):
+        __slots__ = ('_spec', '_schema', '_device', '_output_device')
+
         def __init__(self, **kwargs):
             self._spec = b.OpSpec(type(self).__name__)
-            self._schema = b.GetSchema(type(self).__name__)
+            self._schema = _schema
 
             # Get the device argument. We will need this to determine
             # the device that our outputs will be stored on
@@ -206,15 +181,14 @@ def python_op_factory(name, op_device = "cpu"):
             else:
                 self._device = op_device
             self._spec.AddArg("device", self._device)
+            # Device that the outputs of this operator will be stored on
+            self._output_device = "gpu" if self._device in ("gpu", "mixed") else "cpu"
 
             # Store the specified arguments
-            for key, value in kwargs.items():
-                if isinstance(value, list):
-                    if not value:
-                        raise RuntimeError("List arguments need to have at least 1 element.")
-                dtype = self._schema.GetArgumentType(key)
-                converted_value = _type_convert_value(dtype, value)
-                self._spec.AddArg(key, converted_value)
+            if any(isinstance(value, list) and not value for value in kwargs.values()):
+                raise RuntimeError("List arguments need to have at least 1 element.")
+            self._spec.AddArgs({key: _type_convert_value(_schema.GetArgumentType(key), value)
+                                for key, value in kwargs.items()})
 
         @property
         def spec(self):
@@ -229,49 +203,75 @@ def python_op_factory(name, op_device = "cpu"):
             return self._device
 
         def __call__(self, *inputs, **kwargs):
-            if (len(inputs) > self._schema.MaxNumInput() or
-                    len(inputs) < self._schema.MinNumInput()):
-                raise ValueError(
-                    ("Operator {} expects [{}, " +
-                    "{}] inputs, but received {}")
-                    .format(type(self).__name__,
-                            self._schema.MinNumInput(),
-                            self._schema.MaxNumInput(),
-                            len(inputs)))
+            if not _min_in <= len(inputs) <= _max_in:
+                raise ValueError(_ERR_NUM_INPUTS.format(
+                    type(self).__name__, _min_in, _max_in, len(inputs)))
 
             op_instance = _OperatorInstance(inputs, self, **kwargs)
-            op_instance.generate_outputs()
+            outputs = op_instance.generate_outputs()
 
-            if len(op_instance.outputs) == 1:
-                return op_instance.outputs[0]
-            return op_instance.outputs
+            if len(outputs) == 1:
+                return outputs[0]
+            return outputs
 
     Operator.__name__ = str(name)
     return Operator
 
-def _load_ops():
-    _cpugpu_ops = (set(b.RegisteredCPUOps())
-                .union(set(b.RegisteredGPUOps()))
-                .union(set(b.RegisteredMixedOps())))
+# Operator names are added by _load_ops
+__all__ = ["TFRecordReader", "python_op_factory", "Reload"]
 
-    _cpugpu_ops -= _blacklisted_ops
+_cpugpu_ops = set()
+_support_ops = set()
 
+def _load_ops():
+    global _cpugpu_ops, _support_ops
+    _g = globals()
+    # Drop the classes created so far, so that they are rebuilt on the next access
+    for op_name in _cpugpu_ops | _support_ops:
+        _g.pop(op_name, None)
+    _cpugpu_ops = set()
+    _cpugpu_ops.update(b.RegisteredCPUOps())
+    _cpugpu_ops.update(b.RegisteredGPUOps())
+    _cpugpu_ops.update(b.RegisteredMixedOps())
+    _cpugpu_ops -= _blacklisted_ops
     _support_ops = set(b.RegisteredSupportOps())
-    for op_name in _cpugpu_ops:
-        setattr(sys.modules[__name__], op_name,
-                python_op_factory(op_name, op_device = "cpu"))
-    # add support ops
-    for op_name in _support_ops:
-        setattr(sys.modules[__name__], op_name,
-                python_op_factory(op_name, op_device = "support"))
+    __all__[:] = ([op_name for op_name in sorted(_cpugpu_ops | _support_ops)
+                   if not op_name.startswith("_")] +
+                  ["TFRecordReader", "python_op_factory", "Reload"])
+
+    if sys.version_info < (3, 7):
+        # No module level __getattr__ (PEP 562), so all operator classes are created up front
+        for op_name in _cpugpu_ops:
+            _g[op_name] = python_op_factory(op_name, op_device = "cpu")
+        # add support ops
+        for op_name in _support_ops:
+            _g[op_name] = python_op_factory(op_name, op_device = "support")
 _load_ops()
 
+def __getattr__(name):
+    # Operator classes are created on first access
+    if name in _support_ops:
+        op_device = "support"
+    elif name in _cpugpu_ops:
+        op_device = "cpu"
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    op_class = python_op_factory(name, op_device = op_device)
+    globals()[name] = op_class
+    return op_class
+
+def __dir__():
+    return sorted(set(globals()) | _cpugpu_ops | _support_ops)
+
 def Reload():
     _load_ops()
 
 # custom wrappers around ops
 
-class TFRecordReader(with_metaclass(_DaliOperatorMeta, object)):
+class TFRecordReader(_DaliOperatorBase):
+    __slots__ = ('_path', '_index_path', '_schema', '_spec', '_device',
+                 '_feature_names', '_feature_values')
+
     def __init__(self, path, index_path, features, **kwargs):
         if isinstance(path, list):
             self._path = path
@@ -288,10 +288,10 @@ class TFRecordReader(with_metaclass(_DaliOperatorMeta, object)):
         self._spec.AddArg("path", self._path)
         self._spec.AddArg("index_path", self._index_path)
 
-        for key, value in kwargs.items():
-            self._spec.AddArg(key, value)
+        self._spec.AddArgs(kwargs)
 
-        self._features = features
+        self._feature_names = list(features.keys())
+        self._feature_values = list(features.values())
 
     @property
     def spec(self):
@@ -308,27 +308,16 @@ class TFRecordReader(with_metaclass(_DaliOperatorMeta, object)):
     def __call__(self, *inputs, **kwargs):
         if (len(inputs) > self._schema.MaxNumInput() or
                 len(inputs) < self._schema.MinNumInput()):
-            raise ValueError(
-                ("Operator {} expects [{}, " +
-                "{}] inputs, but received {}")
-                .format(type(self).__name__,
-                        self._schema.MinNumInput(),
-                        self._schema.MaxNumInput(),
-                        len(inputs)))
+            raise ValueError(_ERR_NUM_INPUTS.format(
+                type(self).__name__, self._schema.MinNumInput(),
+                self._schema.MaxNumInput(), len(inputs)))
 
         op_instance = _OperatorInstance(inputs, self, **kwargs)
-        outputs = {}
-        feature_names = []
-        features = []
-        for i, (feature_name, feature) in enumerate(self._features.items()):
-            t_name = "_TFRecordReader" + "_id_" + str(op_instance.id) + "_output_" + str(i)
-            t = TensorReference(t_name, self._device, op_instance)
-            op_instance.spec.AddOutput(t.name, t.device)
-            op_instance.append_output(t)
-            outputs[feature_name] = t
-            feature_names.append(feature_name)
-            features.append(feature)
-
-        op_instance.spec.AddArg("feature_names", feature_names)
-        op_instance.spec.AddArg("features", features)
-        return outputs
+        prefix = "_TFRecordReader_id_{}_output_".format(op_instance.id)
+        outputs = [TensorReference(prefix + str(i), self._device, op_instance)
+                   for i in range(len(self._feature_names))]
+        op_instance.add_outputs(outputs)
+
+        op_instance.spec.AddArg("feature_names", self._feature_names)
+        op_instance.spec.AddArg("features", self._feature_values)
+        return dict(zip(self._feature_names, outputs))
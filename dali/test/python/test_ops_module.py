@@ -0,0 +1,74 @@
+# Copyright (c) 2017-2018, NVIDIA CORPORATION. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import nvidia.dali.ops as ops
+import unittest
+import sys
+import gc
+import weakref
+
+class TestOpsModule(unittest.TestCase):
+    def _uncache_op(self, op_name):
+        # Make sure later tests see the same class as the ones run before
+        op_class = getattr(ops, op_name)
+        self.addCleanup(setattr, ops, op_name, op_class)
+        vars(ops).pop(op_name)
+
+    def test_op_classes_are_created_on_first_access(self):
+        if sys.version_info < (3, 7):
+            self.skipTest("module level __getattr__ requires Python 3.7")
+        self._uncache_op("Copy")
+        assert "Copy" not in vars(ops)
+        copy_op = ops.Copy
+        assert vars(ops)["Copy"] is copy_op
+        assert ops.Copy is copy_op
+
+    def test_reload_rebuilds_op_classes(self):
+        copy_op = ops.Copy
+        self.addCleanup(setattr, ops, "Copy", copy_op)
+        ops.Reload()
+        assert ops.Copy is not copy_op
+        assert ops.Copy.__name__ == "Copy"
+
+    def test_ops_are_listed(self):
+        assert "Copy" in ops.__all__
+        assert "Copy" in dir(ops)
+        assert "TFRecordReader" in ops.__all__
+        assert "MakeContiguous" not in ops.__all__
+        assert not any(op_name.startswith("_") for op_name in ops.__all__)
+
+    def test_unknown_op_raises_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            ops.NotAnOperator
+
+    def test_op_instance_is_freed_with_its_outputs(self):
+        # Reference counting alone has to free the instance, without the cycle collector
+        if gc.isenabled():
+            gc.disable()
+            self.addCleanup(gc.enable)
+        out = ops.ExternalSource()()
+        op_instance = weakref.ref(out.source)
+        assert op_instance().outputs == [out]
+        del out
+        assert op_instance() is None
+
+    def test_op_instance_outputs_keep_positions(self):
+        jpegs, labels = ops.FileReader(file_root = "/data")()
+        op_instance = jpegs.source
+        assert op_instance.outputs == [jpegs, labels]
+        del jpegs
+        assert op_instance.outputs == [None, labels]
+
+if __name__ == '__main__':
+    unittest.main()
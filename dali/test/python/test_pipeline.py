@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from nvidia.dali.pipeline import Pipeline
+from nvidia.dali import backend
 import nvidia.dali.ops as ops
 import nvidia.dali.types as types
 import nvidia.dali.tfrecord as tfrec
@@ -496,3 +497,82 @@ def test_crop():
             img_cmn = cmn_img_batch_cpu.at(b)
             img_crop = crop_img_batch_cpu.at(b)
             assert(np.array_equal(img_cmn, img_crop))
+
+def _add_arg_result(add, key, value):
+    spec = backend.OpSpec("DummyOp")
+    try:
+        add(spec, key, value)
+    except Exception as e:
+        return type(e)
+    return repr(spec)
+
+def test_add_args():
+    values = {"str": "abc", "bool": True, "int": 3, "float": 1.5,
+              "int_list": [1, 2], "float_list": [0.5, 1.5],
+              "str_list": ["a", "b"], "bool_list": [True, False],
+              "enum": types.RGB, "out_of_range_int": 2 ** 70}
+    # AddArgs has to behave exactly like separate AddArg calls
+    for key, value in values.items():
+        batched = _add_arg_result(lambda spec, k, v: spec.AddArgs({k: v}), key, value)
+        single = _add_arg_result(lambda spec, k, v: spec.AddArg(k, v), key, value)
+        assert batched == single, key
+
+    spec = backend.OpSpec("DummyOp")
+    spec.AddArgs({"b": True, "i": 1, "f": 1.0, "s": "1"})
+    spec_str = repr(spec)
+    assert "b: True\n" in spec_str
+    assert "i: 1\n" in spec_str
+    assert "f: 1.000000\n" in spec_str
+    assert "s: 1\n" in spec_str
+
+def _spec_inputs(spec):
+    spec_str = repr(spec)
+    return spec_str[spec_str.index("Inputs:"):spec_str.index("Outputs:")].split()[1:]
+
+def _tensor_names(tensors):
+    return [t.name + "_" + t.device for t in tensors]
+
+def _expect_error(error, message, func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except error as e:
+        assert message in str(e), str(e)
+    else:
+        assert False, "Expected " + error.__name__
+
+def test_input_sets():
+    source = ops.ExternalSource()
+    x0, x1, y0, y1 = [source() for _ in range(4)]
+    dummy = ops.DummyOp(num_outputs = 1)
+    out = dummy([x0, x1], [y0, y1])
+    # Input sets are interleaved
+    assert _spec_inputs(out.source.spec) == _tensor_names([x0, y0, x1, y1])
+    assert "num_input_sets: 2\n" in repr(out.source.spec)
+
+def test_input_errors():
+    source = ops.ExternalSource()
+    x = source()
+    y = source()
+    dummy = ops.DummyOp(num_outputs = 1)
+    _expect_error(TypeError, "Received input type int.", dummy, x, 1)
+    _expect_error(TypeError, "TensorReference or list of TensorReference. Received input type int",
+                  dummy, 1)
+    _expect_error(TypeError, "list of TensorReference. Received input type TensorReference.",
+                  dummy, [x], y)
+    _expect_error(TypeError, "Received input type ndarray.", dummy, [x, np.zeros(1)], [y, x])
+    _expect_error(RuntimeError, "same length (1). Received list of length 2.",
+                  dummy, [x], [x, y])
+
+def test_argument_inputs():
+    source = ops.ExternalSource()
+    x = source()
+    pos_x = source()
+    pos_y = source()
+    crop = ops.Crop(device = "gpu", crop = (224, 224))
+    out = crop(x, crop_pos_y = pos_y, crop_pos_x = pos_x, name = "crop")
+    instance = out.source
+    assert instance.name == "crop"
+    # Argument inputs follow the regular inputs, ordered by argument name
+    assert instance.inputs == [x, pos_x, pos_y]
+    assert _spec_inputs(instance.spec) == _tensor_names([x, pos_x, pos_y])
+    _expect_error(TypeError, "Received input type float.", crop, x, crop_pos_x = 0.5)
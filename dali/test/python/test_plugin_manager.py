@@ -87,6 +87,12 @@ class TestLoadedPlugin(unittest.TestCase):
         plugin_manager.load_library( test_bin_dir + "/libcustomdummyplugin.so" )
         print(ops.CustomDummy)
 
+    def test_load_custom_operator_plugin_lists_op(self):
+        plugin_manager.load_library( test_bin_dir + "/libcustomdummyplugin.so" )
+        assert "CustomDummy" in ops.__all__
+        assert "CustomDummy" in dir(ops)
+        assert ops.CustomDummy is ops.CustomDummy
+
     def test_pipeline_including_custom_plugin(self):
         plugin_manager.load_library( test_bin_dir + "/libcustomdummyplugin.so")
         pipe = CustomPipeline(batch_size, 1, 0)